@@ -4,7 +4,9 @@ from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import device_registry
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_METRICS
+from .services import async_setup_services
+from .websocket import async_setup_websocket
 
 PLATFORMS = ["sensor"]  # used with the new config_entries helpers
 
@@ -12,6 +14,8 @@ PLATFORMS = ["sensor"]  # used with the new config_entries helpers
 async def async_setup(hass: HomeAssistant, config: dict):
     # keep YAML support: if YAML config present, import to config entries (optional)
     # return True to finish setup when integration is loaded from YAML
+    async_setup_services(hass)
+    async_setup_websocket(hass)
     return True
 
 
@@ -38,4 +42,5 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        hass.data[DOMAIN].get(DATA_METRICS, {}).pop(f"{DOMAIN}_{entry.entry_id}", None)
     return unload_ok
\ No newline at end of file
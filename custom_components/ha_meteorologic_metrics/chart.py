@@ -0,0 +1,114 @@
+"""Psychrometric chart line sets, cached per pressure bucket."""
+
+from __future__ import annotations
+
+from copy import deepcopy
+from functools import lru_cache
+import logging
+
+from .helpers import *
+from .const import *
+from .engine import (
+    enthalpy,
+    humidity_ratio_enthalpy,
+    humidity_ratio_rh,
+    humidity_ratio_wet_bulb,
+    wet_bulb_temperature,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def _chart_lines(pressure):
+    """Saturation, constant RH, wet bulb and enthalpy lines as [T °C, W kg/kg] pairs.
+
+    Humidity ratios use the ASHRAE closed forms from engine.py directly:
+    psySI.state also solves wet bulb and fails below 0 °C WBT, which would drop
+    valid points. RH (and the saturation curve) is relative to liquid water,
+    like the humidity sensors plotted on top. Callers get a copy (see chart_data).
+    """
+    temps = range(CHART_TEMP_RANGE[0], CHART_TEMP_RANGE[1] + 1, CHART_TEMP_STEP)
+    saturation = {t: humidity_ratio_rh(toK(t), 1.0, pressure) for t in temps}
+
+    def line(w_of_t, start=CHART_TEMP_RANGE[0]):
+        points = []
+        for t in temps:
+            if t < start:
+                continue
+            W = w_of_t(toK(t))
+            # keep only the part of the line inside the chart (dry air .. saturation)
+            if W < 0 or W > saturation[t] + 1e-9:
+                continue
+            points.append([t, round(W, 6)])
+        return points
+
+    lines = {
+        "saturation": [[t, round(W, 6)] for t, W in saturation.items()],
+        "relative_humidity": {
+            str(rh): line(lambda tk, rh=rh: humidity_ratio_rh(tk, rh / 100.0, pressure)) for rh in CHART_RH_LINES
+        },
+        # a wet bulb line starts on the saturation curve where DBT == WBT
+        "wet_bulb": {
+            str(wbt): line(lambda tk, wbt=wbt: humidity_ratio_wet_bulb(tk, toK(wbt), pressure), start=wbt)
+            for wbt in CHART_WET_BULB_LINES
+        },
+        "enthalpy": {str(h): line(lambda tk, h=h: humidity_ratio_enthalpy(tk, h)) for h in CHART_ENTHALPY_LINES},
+    }
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("chart: computed line set for %s Pa", pressure)
+    return lines
+
+
+def _current_point(data):
+    """Chart coordinates of a MetricsData instance's latest state, or None."""
+    cache = data.refresh()
+    S = cache.get("S")
+    if not S or S[0] is None or S[4] is None:
+        # psySI fails below 0 °C wet bulb; place the point from the filtered inputs
+        # instead (sensor RH is relative to liquid water)
+        temp_k, hum, pressure = cache.get("temp_out_k"), cache.get("hum_out"), cache.get("pressure")
+        if temp_k is None or hum is None or pressure is None:
+            return None
+        W = humidity_ratio_rh(temp_k, hum / 100.0, pressure)
+        point = {
+            "temperature": round(toC(temp_k), 2),
+            "humidity_ratio": round(W, 6),
+            "relative_humidity": round(hum, 2),
+            "wet_bulb": round(toC(wet_bulb_temperature(temp_k, W, pressure)), 2),
+            "enthalpy": round(enthalpy(temp_k, W), 2),
+        }
+    else:
+        point = {
+            "temperature": round(toC(S[0]), 2),
+            "humidity_ratio": round(S[4], 6),
+            "relative_humidity": round(S[2] * 100.0, 2) if S[2] is not None else None,
+            "wet_bulb": round(toC(S[5]), 2) if S[5] is not None else None,
+            "enthalpy": round(S[1], 2) if S[1] is not None else None,
+        }
+    point["in_chart"] = CHART_TEMP_RANGE[0] <= point["temperature"] <= CHART_TEMP_RANGE[1]
+    return point
+
+
+def chart_data(instances, pressure_hpa=None):
+    """Chart line set plus the current point of every instance.
+
+    ``instances`` maps a key (wet bulb entity_id) to MetricsData. Without an
+    explicit pressure the first instance's current pressure is used. Blocking;
+    run it from an executor thread.
+    """
+    points = {key: _current_point(data) for key, data in instances.items()}
+
+    if pressure_hpa is not None:
+        pressure = pressure_hpa * 100.0
+    else:
+        pressures = (data.refresh().get("pressure") for data in instances.values())
+        pressure = next((p for p in pressures if p), DEFAULT_PRESSURE_HPA * 100.0)
+    bucket = round(pressure / CHART_PRESSURE_BUCKET) * CHART_PRESSURE_BUCKET
+
+    return {
+        "pressure_hPa": round(bucket / 100.0, 2),
+        # copy so callers cannot mutate the cached line set
+        "lines": deepcopy(_chart_lines(bucket)),
+        "points": points,
+    }
@@ -4,7 +4,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.selector import selector
 import voluptuous as vol
 from typing import Any
-from .const import DOMAIN, CONF_TEMP, CONF_HUMIDITY, CONF_DEW_POINT, CONF_PRESSURE, CONF_NAME, DEFAULT_SENSOR_NAME, CONF_INDOOR_SENSOR
+from .const import DOMAIN, CONF_TEMP, CONF_HUMIDITY, CONF_DEW_POINT, CONF_PRESSURE, CONF_NAME, DEFAULT_SENSOR_NAME, CONF_INDOOR_SENSOR, CONF_INPUT_FILTER, FILTER_NONE, FILTER_MODES, CONF_TRACE, CONF_WEATHER
 
 EXPOSE_ALL = "expose_all"
 
@@ -14,10 +14,16 @@ DATA_SCHEMA = vol.Schema(
         vol.Required(CONF_HUMIDITY): selector({"entity": {"domain": "sensor"}}),
         vol.Required(CONF_PRESSURE): selector({"entity": {"domain": "sensor"}}),
         vol.Optional(CONF_DEW_POINT, default=""): selector({"entity": {"domain": "sensor"}}),
+        # optional weather entity whose hourly forecast is turned into forecast metrics
+        vol.Optional(CONF_WEATHER, default=""): selector({"entity": {"domain": "weather"}}),
         vol.Optional(CONF_NAME, default=DEFAULT_SENSOR_NAME): str,
         vol.Optional(EXPOSE_ALL, default=False): bool,
         # HVAC/psychrometrics useful for indoor/energy calculations, optional for plain meteorologic displays
         vol.Optional(CONF_INDOOR_SENSOR, default=False): bool,
+        # optional smoothing on top of the always-on range / rate-of-change checks
+        vol.Optional(CONF_INPUT_FILTER, default=FILTER_NONE): selector({"select": {"options": FILTER_MODES}}),
+        # record one compact trace per computation (shown in the diagnostics download)
+        vol.Optional(CONF_TRACE, default=False): bool,
     }
 )
 
@@ -29,6 +35,8 @@ class MeteorologicMetricsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # normalize empty dew to None
             if user_input.get(CONF_DEW_POINT) == "":
                 user_input.pop(CONF_DEW_POINT, None)
+            if user_input.get(CONF_WEATHER) == "":
+                user_input.pop(CONF_WEATHER, None)
             title = user_input.get(CONF_NAME) or DEFAULT_SENSOR_NAME
             # ensure expose_all is present (bool)
             user_input.setdefault(EXPOSE_ALL, False)
@@ -4,8 +4,12 @@ CONF_HUMIDITY = 'hum'
 CONF_DEW_POINT = 'dew'
 CONF_PRESSURE = 'pressure'
 CONF_NAME = 'name'
+CONF_WEATHER = 'weather'
 DEFAULT_SENSOR_NAME = 'Meteorologic Metrics'
 
+# hass.data[DOMAIN][DATA_METRICS] maps base_id -> MetricsData for every configured instance
+DATA_METRICS = 'metrics'
+
 # New option to indicate sensors are indoor (enable HVAC fallbacks/attributes)
 CONF_INDOOR_SENSOR = 'indoor_sensor_source'
 
@@ -30,4 +34,48 @@ c5 = -0.012308094
 c6 = -0.0164248277778
 c7 = 0.002211732
 c8 = 0.00072546
-c9 = -0.000003582
\ No newline at end of file
+c9 = -0.000003582
+
+# Input filter stage (rejects glitchy readings before psySI is called)
+CONF_INPUT_FILTER = 'input_filter'
+FILTER_NONE = 'none'
+FILTER_MEDIAN = 'median'
+FILTER_HAMPEL = 'hampel'
+FILTER_MODES = [FILTER_NONE, FILTER_MEDIAN, FILTER_HAMPEL]
+
+FILTER_WINDOW = 5          # ring buffer size for median / Hampel filters
+HAMPEL_THRESHOLD = 3.0     # reject when |x - median| > threshold * max(1.4826 * MAD, min scale)
+FILTER_MAX_REJECTS = 3     # accept a persistent step change after this many consecutive rejections
+
+# Physical ranges in internal units (K, %, Pa)
+RANGE_TEMP_K = (183.15, 333.15)
+RANGE_HUMIDITY = (0.5, 100.0)
+RANGE_PRESSURE_PA = (30000.0, 110000.0)
+
+# Maximum plausible rate of change per second in internal units (K/s, %/s, Pa/s)
+RATE_TEMP_K = 10.0 / 60
+RATE_HUMIDITY = 30.0 / 60
+RATE_PRESSURE_PA = 1000.0 / 60
+
+# Minimum Hampel scale in internal units (K, %, Pa) so a flat window of quantized
+# readings (MAD == 0) still rejects a single spike
+HAMPEL_MIN_SCALE_TEMP_K = 0.5
+HAMPEL_MIN_SCALE_HUMIDITY = 2.0
+HAMPEL_MIN_SCALE_PRESSURE_PA = 50.0
+
+# Structured trace of each computation (inputs, engine, duration), kept in a ring buffer
+CONF_TRACE = 'trace'
+
+# Bulk metric queries (service / websocket)
+MAX_BULK_POINTS = 5000     # points accepted per request
+BULK_CACHE_SIZE = 8192     # solved points kept in the LRU cache
+DEFAULT_PRESSURE_HPA = 1013.25
+
+# Psychrometric chart data
+CHART_TEMP_RANGE = (-20, 50)        # °C; instance points outside it are flagged in_chart: false
+CHART_TEMP_STEP = 1                 # °C between points on each line
+CHART_RH_LINES = [10, 20, 30, 40, 50, 60, 70, 80, 90]          # %
+CHART_WET_BULB_LINES = [-15, -10, -5, 0, 5, 10, 15, 20, 25, 30]  # °C
+CHART_ENTHALPY_LINES = [-10, 0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120]  # kJ/kg
+CHART_PRESSURE_BUCKET = 500.0       # Pa, pressures in the same bucket share one line set
+CHART_CACHE_SIZE = 8                # pressure buckets kept in the LRU cache
@@ -0,0 +1,20 @@
+"""Diagnostics support for Meteorologic Metrics."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_METRICS
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return filter counters, suppressed warnings and the computation trace for a config entry."""
+    data = hass.data.get(DOMAIN, {}).get(DATA_METRICS, {}).get(f"{DOMAIN}_{entry.entry_id}")
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "metrics": data.diagnostics() if data is not None else None,
+    }
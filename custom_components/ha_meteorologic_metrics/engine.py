@@ -0,0 +1,227 @@
+"""Pure psychrometric computations shared by MetricsData, forecasts and services."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import logging
+import math as m
+
+from psypy import psySI as SI
+
+from .helpers import *
+from .const import *
+
+logger = logging.getLogger(__name__)
+
+
+def solve_state(temp_k, hum, pressure):
+    """Call psySI.state for DBT (K), RH (%) and P (Pa).
+
+    Returns (S, engine) with S temperatures normalized to Kelvin. Raises the
+    last psySI exception when both the Kelvin and the °C attempt fail.
+    """
+    try:
+        # Try calling with DBT as provided (likely Kelvin in our code)
+        S = SI.state("DBT", temp_k, "RH", hum / 100.0, pressure)
+        engine = "psySI"
+    except Exception:
+        # Retry with DBT converted to Celsius if the library expects °C
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("solve_state: retry psySI.state with DBT in °C")
+        S = SI.state("DBT", toC(temp_k), "RH", hum / 100.0, pressure)
+        engine = "psySI (°C retry)"
+
+    # Normalize returned S so callers can assume temperatures are in Kelvin.
+    if S and isinstance(S, (list, tuple)) and len(S) >= 6:
+        s0 = S[0]
+        # If returned DBT looks like Celsius (< 200), convert DBT and WBT to Kelvin
+        if isinstance(s0, (int, float)) and s0 < 200:
+            S = list(S)
+            S[0] = toK(S[0])
+            if S[5] is not None:
+                S[5] = toK(S[5])
+        S = tuple(S)
+    return S, engine
+
+
+def calculate_dewpoint(temp_out_k, hum_out):
+    # log(0) is undefined: no dew point for dry air (also keeps bad forecast hours out of the log)
+    if temp_out_k is not None and hum_out is not None and hum_out > 0:
+        try:
+            alpha = m.log(hum_out / 100) + (AA * toC(temp_out_k)) / (BB + toC(temp_out_k))
+            dp = (BB * alpha) / (AA - alpha)
+            return dp
+        except Exception:
+            logger.debug("MetricsData: invalid inputs for dewpoint calc (temp_k=%s, hum=%s)", temp_out_k, hum_out)
+    return None
+
+
+"""
+heat_index_c is only computed when the Fahrenheit temperature T > 80 and relative humidity R > 40 
+For typical outdoor temps (well under 80°F) the function returns None, so the attribute is not added.
+"""
+def calculate_heat_index(temp_k, hum):
+    if temp_k is not None and hum is not None:
+        T = KtoF(temp_k)
+        R = hum
+        if T > 80 and R > 40:
+            hi = c1 + c2 * T + c3 * R + c4 * T * R + c5 * m.pow(T, 2) + c6 * m.pow(R, 2) + c7 * m.pow(T, 2) * R + c8 * m.pow(R, 2) * T + c9 * m.pow(T, 2) * m.pow(R, 2)
+            return FtoC(hi)
+    return None
+
+
+def calculate_wb_stull(temp_k, hum):
+    if temp_k is None or hum is None:
+        return None
+    T = toC(temp_k)
+    H = hum
+    if not isinstance(H, (int, float)) or not isinstance(T, (int, float)):
+        return None
+    if H > 5 and H < 99 and T > -20 and T < 50:
+        return T * m.atan(0.151977 * m.pow(H + 8.313659, 0.5)) + m.atan(T + H) - m.atan(H - 1.676331) + 0.00391838 * m.pow(H, 3/2) * m.atan(0.023101 * H) - 4.686035
+    return None
+
+
+def determine_comfort(dp):
+    if dp is None:
+        return None
+    if dp > 21:
+        return 4
+    if dp > 18:
+        return 3
+    if dp > 16:
+        return 2
+    if dp > 10:
+        return 1
+    return 0
+
+
+# --- ASHRAE 2009 Chapter 1 closed forms (no wet bulb solve, valid below 0 °C) ---
+
+def saturation_pressure(temp_k, over_ice=False):
+    """Saturation vapour pressure (Pa), Eq. 6 over liquid water or Eq. 5 over ice below 0 °C.
+
+    Humidity sensors report RH relative to liquid water, so RH conversions use
+    the default; the ice branch is for wet bulb / frost point below freezing.
+    """
+    if over_ice and temp_k < KELVIN_CONVERSION:
+        return m.exp(-5.6745359e3 / temp_k + 6.3925247 - 9.677843e-3 * temp_k + 6.2215701e-7 * temp_k ** 2
+                     + 2.0747825e-9 * temp_k ** 3 - 9.484024e-13 * temp_k ** 4 + 4.1635019 * m.log(temp_k))
+    return m.exp(-5.8002206e3 / temp_k + 1.3914993 - 4.8640239e-2 * temp_k + 4.1764768e-5 * temp_k ** 2
+                 - 1.4452093e-8 * temp_k ** 3 + 6.5459673 * m.log(temp_k))
+
+
+# Eqs. 22 and 24
+def humidity_ratio_rh(temp_k, rh, pressure, over_ice=False):
+    """Humidity ratio (kg/kg) for RH as a fraction."""
+    pw = rh * saturation_pressure(temp_k, over_ice)
+    return 0.621945 * pw / (pressure - pw)
+
+
+# Eq. 32
+def enthalpy(temp_k, w):
+    """Specific enthalpy (kJ/kg dry air)."""
+    t = toC(temp_k)
+    return 1.006 * t + w * (2501 + 1.86 * t)
+
+
+def humidity_ratio_enthalpy(temp_k, h):
+    """Humidity ratio (kg/kg) for specific enthalpy h (kJ/kg)."""
+    t = toC(temp_k)
+    return (h - 1.006 * t) / (2501 + 1.86 * t)
+
+
+# Eq. 28
+def specific_volume(temp_k, w, pressure):
+    """Specific volume (m³/kg dry air)."""
+    return 287.042 * temp_k * (1 + 1.607858 * w) / pressure
+
+
+# Eq. 35 (wet bulb above freezing) and Eq. 37 (below freezing, saturation over ice)
+def humidity_ratio_wet_bulb(temp_k, wbt_k, pressure):
+    """Humidity ratio (kg/kg) for a wet bulb temperature wbt_k."""
+    t, t_wb = toC(temp_k), toC(wbt_k)
+    ws = humidity_ratio_rh(wbt_k, 1.0, pressure, over_ice=True)
+    if t_wb >= 0:
+        return ((2501 - 2.326 * t_wb) * ws - 1.006 * (t - t_wb)) / (2501 + 1.86 * t - 4.186 * t_wb)
+    return ((2830 - 0.24 * t_wb) * ws - 1.006 * (t - t_wb)) / (2830 + 1.86 * t - 2.1 * t_wb)
+
+
+def wet_bulb_temperature(temp_k, w, pressure):
+    """Wet bulb (K) for humidity ratio w, by bisection on humidity_ratio_wet_bulb."""
+    low, high = KELVIN_CONVERSION - 100.0, temp_k
+    while high - low > 0.0005:
+        mid = (low + high) / 2
+        if humidity_ratio_wet_bulb(temp_k, mid, pressure) > w:
+            high = mid
+        else:
+            low = mid
+    return (low + high) / 2
+
+
+def _round(value, digits):
+    return round(value, digits) if isinstance(value, (int, float)) else None
+
+
+def compute_point(temp_k, hum, pressure):
+    """All metrics for one (DBT K, RH %, P Pa) point, rounded like the entity attributes.
+
+    psySI is tried first (same engine as MetricsData). It cannot solve a wet bulb
+    below 0 °C and then returns nothing or a partial state; the missing SI
+    properties come from the closed forms above and ``wet_bulb_source`` says
+    which method produced the wet bulb.
+    """
+    try:
+        S, _engine = solve_state(temp_k, hum, pressure)
+    except Exception:
+        S = None
+    dew_c = calculate_dewpoint(temp_k, hum)
+
+    if S and all(v is not None for v in S[1:6]):
+        wet_bulb_c, wet_bulb_source = toC(S[5]), "psySI"
+        h, v, w = S[1], S[3], S[4]
+    else:
+        w = humidity_ratio_rh(temp_k, hum / 100.0, pressure)
+        h = enthalpy(temp_k, w)
+        v = specific_volume(temp_k, w, pressure)
+        wet_bulb_c, wet_bulb_source = toC(wet_bulb_temperature(temp_k, w, pressure)), "ashrae"
+
+    return {
+        "wet_bulb": _round(wet_bulb_c, 2),
+        "wet_bulb_source": wet_bulb_source,
+        "wet_bulb_stull": _round(calculate_wb_stull(temp_k, hum), 2),
+        "dew_point": _round(dew_c, 2),
+        "heat_index": _round(calculate_heat_index(temp_k, hum), 2),
+        "comfort_level": determine_comfort(dew_c),
+        "enthalpy": _round(h, 2),
+        "specific_volume": _round(v, 4),
+        "humidity_ratio": _round(w, 6),
+    }
+
+
+@lru_cache(maxsize=BULK_CACHE_SIZE)
+def _cached_point(temp_k, hum, pressure):
+    return compute_point(temp_k, hum, pressure)
+
+
+def compute_points(temperatures_c, humidities, pressures_hpa):
+    """Batch of compute_point for °C / % / hPa inputs, served from an LRU cache.
+
+    Inputs are rounded to 0.01 °C, 0.1 % and 1 Pa before lookup so repeated
+    chart overlays hit the cache. ``pressures_hpa`` may be a single value or a
+    list the same length as the temperatures. Raises ValueError on bad shapes.
+    """
+    if len(temperatures_c) != len(humidities):
+        raise ValueError("temperature and humidity must have the same length")
+    if isinstance(pressures_hpa, (int, float)):
+        pressures_hpa = [pressures_hpa] * len(temperatures_c)
+    elif len(pressures_hpa) != len(temperatures_c):
+        raise ValueError("pressure must be a single value or have the same length as temperature")
+    if len(temperatures_c) > MAX_BULK_POINTS:
+        raise ValueError(f"at most {MAX_BULK_POINTS} points per request")
+
+    return [
+        # copy so callers cannot mutate cached entries
+        dict(_cached_point(round(toK(t), 2), round(h, 1), round(p * 100.0)))
+        for t, h, p in zip(temperatures_c, humidities, pressures_hpa)
+    ]
@@ -0,0 +1,108 @@
+"""Cheap plausibility filters applied to sensor inputs before the psySI solve."""
+
+from __future__ import annotations
+
+from collections import deque
+import logging
+import statistics
+import time
+
+from .const import (
+    FILTER_HAMPEL,
+    FILTER_MAX_REJECTS,
+    FILTER_MEDIAN,
+    FILTER_NONE,
+    FILTER_WINDOW,
+    HAMPEL_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InputFilter:
+    """Range, rate-of-change and optional median/Hampel filter for one input.
+
+    A rejected sample is replaced by the last accepted value (or None if nothing
+    was accepted yet) so a single glitch never reaches the solver. An input that
+    stays out of range for FILTER_MAX_REJECTS samples is reported as None (the
+    entity goes unavailable) and ``warn`` is called with a rate-limit key, a
+    message and its arguments.
+    """
+
+    def __init__(self, label: str, valid_range: tuple, max_rate: float, min_scale: float,
+                 mode: str = FILTER_NONE, warn=None):
+        self.label = label
+        self.warn = warn
+        self.min_value, self.max_value = valid_range
+        self.max_rate = max_rate
+        self.min_scale = min_scale
+        self.mode = mode if mode in (FILTER_MEDIAN, FILTER_HAMPEL) else FILTER_NONE
+        self.window = deque(maxlen=FILTER_WINDOW)
+        self.last_value = None
+        self.last_time = None
+        self.consecutive_rejects = 0
+        self.consecutive_range = 0
+        self.rejected = {"range": 0, "rate": 0, "outlier": 0}
+
+    def __call__(self, value, now: float | None = None):
+        if value is None:
+            return None
+        now = time.time() if now is None else now
+
+        reason = self._check(value, now)
+        if reason == "range":
+            # out-of-range readings are never plausible, even if they persist
+            self._reject(reason, value)
+            self.consecutive_range += 1
+            if self.consecutive_range < FILTER_MAX_REJECTS:
+                return self.last_value
+            # persistent (unit change, sensor outside the supported range): stop
+            # reporting a stale value and start fresh once readings are valid again
+            if self.warn is not None:
+                self.warn(f"range_{self.label}",
+                          "Input %s out of range (%s..%s) for %d samples: %s; treating it as unavailable",
+                          self.label, self.min_value, self.max_value, self.consecutive_range, value)
+            self.last_value = None
+            self.last_time = None
+            self.window.clear()
+            return None
+        self.consecutive_range = 0
+        if reason is not None:
+            self.consecutive_rejects += 1
+            if self.consecutive_rejects < FILTER_MAX_REJECTS:
+                self._reject(reason, value)
+                return self.last_value
+            # the input has settled on a new level: restart from it
+            logger.debug("InputFilter %s: accepting step change to %s", self.label, value)
+            self.window.clear()
+
+        self.consecutive_rejects = 0
+        self.window.append(value)
+        if self.mode == FILTER_MEDIAN:
+            value = statistics.median(self.window)
+        self.last_value = value
+        self.last_time = now
+        return value
+
+    def _check(self, value, now):
+        if not self.min_value <= value <= self.max_value:
+            return "range"
+        if self.last_value is not None and self.last_time is not None:
+            elapsed = max(now - self.last_time, 1.0)
+            if abs(value - self.last_value) > self.max_rate * elapsed:
+                return "rate"
+        if self.mode == FILTER_HAMPEL and len(self.window) >= 3:
+            med = statistics.median(self.window)
+            mad = statistics.median(abs(v - med) for v in self.window)
+            scale = max(1.4826 * mad, self.min_scale)
+            if abs(value - med) > HAMPEL_THRESHOLD * scale:
+                return "outlier"
+        return None
+
+    def _reject(self, reason, value):
+        self.rejected[reason] += 1
+        logger.debug("InputFilter %s: rejected %s (%s), keeping %s", self.label, value, reason, self.last_value)
+
+    @property
+    def rejected_total(self):
+        return sum(self.rejected.values())
@@ -13,6 +13,11 @@ from .const import (
     CONF_NAME,
     DOMAIN,
     CONF_INDOOR_SENSOR,
+    CONF_INPUT_FILTER,
+    FILTER_NONE,
+    FILTER_MODES,
+    CONF_TRACE,
+    CONF_WEATHER,
 )
 EXPOSE_ALL = "expose_all"
 
@@ -38,10 +43,16 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Required(CONF_HUMIDITY, default=current.get(CONF_HUMIDITY, "")): selector({"entity": {"domain": "sensor"}}),
                 vol.Required(CONF_PRESSURE, default=current.get(CONF_PRESSURE, "")): selector({"entity": {"domain": "sensor"}}),
                 vol.Optional(CONF_DEW_POINT, default=current.get(CONF_DEW_POINT, "")): selector({"entity": {"domain": "sensor"}}),
+                # optional weather entity whose hourly forecast is turned into forecast metrics
+                vol.Optional(CONF_WEATHER, default=current.get(CONF_WEATHER, "")): selector({"entity": {"domain": "weather"}}),
                 vol.Optional(CONF_NAME, default=current.get(CONF_NAME, "Meteorologic Metrics")): str,
                 vol.Optional(EXPOSE_ALL, default=current.get(EXPOSE_ALL, False)): bool,
                 # indoor sensor toggle, optional for plain meteorologic displays
                 vol.Optional(CONF_INDOOR_SENSOR, default=current.get(CONF_INDOOR_SENSOR, False)): bool,
+                # optional smoothing on top of the always-on range / rate-of-change checks
+                vol.Optional(CONF_INPUT_FILTER, default=current.get(CONF_INPUT_FILTER, FILTER_NONE)): selector({"select": {"options": FILTER_MODES}}),
+                # record one compact trace per computation (shown in the diagnostics download)
+                vol.Optional(CONF_TRACE, default=current.get(CONF_TRACE, False)): bool,
             }
         )
 
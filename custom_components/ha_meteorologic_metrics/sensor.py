@@ -13,18 +13,22 @@ from homeassistant.const import UnitOfTemperature, UnitOfPressure, PERCENTAGE
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
+from collections import deque
 import logging
-import math as m
 import time
-from psypy import psySI as SI
 
 from .helpers import *
 from .const import *
+from .filters import InputFilter
+from .engine import *
 
 logger = logging.getLogger(__name__)
 
 PLATFORMS = ["sensor"]
 CACHE_TTL = 30.0  # seconds cache for metrics computations to avoid repeated calls
+WARNING_INTERVAL = 600.0  # seconds between repeated warnings for the same input entity
+TRACE_BUFFER_SIZE = 200  # computations kept in the trace ring buffer
+FORECAST_TTL = 1800.0  # seconds between weather.get_forecasts calls when the weather entity has not changed
 
 
 def setup_platform(hass, config, add_devices, discovery_info=None):
@@ -60,7 +64,9 @@ def build_entities(hass, cfg, entry_id: str | None = None):
         f"{DOMAIN}_{(cfg.get(CONF_TEMP) or '').replace('.', '_')}_{(cfg.get(CONF_HUMIDITY) or '').replace('.', '_')}"
     )
 
-    data = MetricsData(hass, cfg)
+    data = MetricsData(hass, cfg, entry_id)
+    # register the shared data holder so diagnostics and services can reach it
+    hass.data.setdefault(DOMAIN, {}).setdefault(DATA_METRICS, {})[base_id] = data
 
     # default: only main wet bulb sensor
     entities = [WetBulbSISensor(hass, data, name, base_id)]
@@ -85,20 +91,44 @@ def build_entities(hass, cfg, entry_id: str | None = None):
 class MetricsData:
     """Shared data holder and calculator for the metrics."""
 
-    def __init__(self, hass: HomeAssistant, config: dict):
+    def __init__(self, hass: HomeAssistant, config: dict, entry_id: str | None = None):
         self.hass = hass
         self.config = config or {}
+        self.entry_id = entry_id
+        self.entity_id = None
         self.outdoorTemp = self.config.get(CONF_TEMP)
         self.outdoorHum = self.config.get(CONF_HUMIDITY)
         self.pressureSensor = self.config.get(CONF_PRESSURE)
         self.dewSensor = self.config.get(CONF_DEW_POINT)
+        self.weatherEntity = self.config.get(CONF_WEATHER)
         # if True, compute HVAC fallbacks (enthalpy, w, v) and expose them as attributes
         self.indoor_source = bool(self.config.get(CONF_INDOOR_SENSOR, False))
 
+        # per-key warning rate limiting: key -> [last emitted time, suppressed count]
+        self._warned = {}
+
+        # pre-filter stage: reject implausible readings before they reach psySI
+        filter_mode = self.config.get(CONF_INPUT_FILTER, FILTER_NONE)
+        self.filters = {
+            "temp": InputFilter("temp", RANGE_TEMP_K, RATE_TEMP_K, HAMPEL_MIN_SCALE_TEMP_K, filter_mode, self._warn),
+            "hum": InputFilter("hum", RANGE_HUMIDITY, RATE_HUMIDITY, HAMPEL_MIN_SCALE_HUMIDITY, filter_mode, self._warn),
+            "pressure": InputFilter("pressure", RANGE_PRESSURE_PA, RATE_PRESSURE_PA, HAMPEL_MIN_SCALE_PRESSURE_PA, filter_mode, self._warn),
+            "dew": InputFilter("dew", RANGE_TEMP_K, RATE_TEMP_K, HAMPEL_MIN_SCALE_TEMP_K, filter_mode, self._warn),
+        }
+
+        # optional structured trace: one compact record per computation
+        self.trace = deque(maxlen=TRACE_BUFFER_SIZE) if self.config.get(CONF_TRACE, False) else None
+
         self.last_update = 0.0
         self._cache = {}
         self.lock = False
 
+        # forecast metrics are cached until the weather entity or its forecast changes
+        self._forecast = None
+        self._forecast_key = None
+        self._forecast_stamp = None
+        self._forecast_fetched = 0.0
+
     def refresh(self):
         """Refresh cached metrics if TTL expired. Synchronous helper used by entities."""
         now = time.time()
@@ -109,19 +139,22 @@ class MetricsData:
         if self.lock:
             return self._cache
         self.lock = True
+        debug = logger.isEnabledFor(logging.DEBUG)
+        started = time.perf_counter()
         try:
             result = {}
             # read and normalize inputs (reuse same helper logic)
-            result["temp_out_k"] = self._outdoor_temp()
-            result["hum_out"] = self._outdoor_hum()
-            result["pressure"] = self._pressure()
+            result["temp_out_k"] = self.filters["temp"](self._outdoor_temp(), now)
+            result["hum_out"] = self.filters["hum"](self._outdoor_hum(), now)
+            result["pressure"] = self.filters["pressure"](self._pressure(), now)
 
-            logger.debug("MetricsData inputs: temp_k=%s hum=%s pressure=%s",
-                         result["temp_out_k"], result["hum_out"], result["pressure"])
+            if debug:
+                logger.debug("MetricsData inputs: temp_k=%s hum=%s pressure=%s",
+                             result["temp_out_k"], result["hum_out"], result["pressure"])
 
             # dew handling
             if self.dewSensor:
-                dew_k = self._dew_temp()
+                dew_k = self.filters["dew"](self._dew_temp(), now)
                 result["dew_temp_k"] = dew_k
                 if dew_k is not None and result["temp_out_k"] is not None:
                     result["web_bulb_dew_k"] = result["temp_out_k"] - (result["temp_out_k"] - dew_k) / 3
@@ -134,38 +167,26 @@ class MetricsData:
                 result["web_bulb_dew_k"] = None
 
             # call psySI if we have required inputs
+            engine = None
             if result["temp_out_k"] is None or result["hum_out"] is None or result["pressure"] is None:
-                logger.debug("MetricsData: insufficient data for psySI computation")
+                if debug:
+                    logger.debug("MetricsData: insufficient data for psySI computation")
                 result["S"] = None
             else:
-                try:
+                if debug:
                     logger.debug("MetricsData: calling psySI.state DBT=%s RH=%s P=%s",
                                  result["temp_out_k"], result["hum_out"]/100.0, result["pressure"])
-                    # Try calling with DBT as provided (likely Kelvin in our code)
-                    S = SI.state("DBT", result["temp_out_k"], "RH", result["hum_out"]/100.0, result["pressure"])
+                try:
+                    S, engine = solve_state(result["temp_out_k"], result["hum_out"], result["pressure"])
                 except Exception:
-                    # Retry with DBT converted to Celsius if the library expects °C
-                    try:
-                        logger.debug("MetricsData: retry psySI.state with DBT in °C")
-                        S = SI.state("DBT", toC(result["temp_out_k"]), "RH", result["hum_out"]/100.0, result["pressure"])
-                    except Exception:
-                        logger.exception("MetricsData: psySI.state failure (both attempts)")
-                        S = None
-
-                # Normalize returned S so internal code can assume temperatures are in Kelvin.
-                if S and isinstance(S, (list, tuple)) and len(S) >= 6:
-                    s0 = S[0]
-                    # If returned DBT looks like Celsius (< 200), convert DBT and WBT to Kelvin
-                    if isinstance(s0, (int, float)) and s0 < 200:
-                        logger.debug("MetricsData: psySI returned temperatures in °C, converting to K for internal use")
-                        S = list(S)
-                        S[0] = toK(S[0])
-                        if S[5] is not None:
-                            S[5] = toK(S[5])
-                        S = tuple(S)
+                    self._warn("psySI", "MetricsData: psySI.state failure (both attempts) for DBT=%s RH=%s P=%s",
+                               result["temp_out_k"], result["hum_out"], result["pressure"], exc_info=True)
+                    S = None
+                    engine = "failed"
 
                 result["S"] = S
-                logger.debug("MetricsData: psySI returned %s", repr(S))
+                if debug:
+                    logger.debug("MetricsData: psySI returned %s", S)
 
             # other derived metrics
             result["wet_bulb_stull_c"] = self._calculate_wb_stull(result["temp_out_k"], result["hum_out"])
@@ -174,6 +195,14 @@ class MetricsData:
                 toC(result["dew_temp_k"]) if result["dew_temp_k"] is not None else result["dew_temp_estimate_c"]
             )
 
+            if self.trace is not None:
+                self.trace.append({
+                    "ts": round(now, 3),
+                    "inputs": (result["temp_out_k"], result["hum_out"], result["pressure"], result["dew_temp_k"]),
+                    "engine": engine,
+                    "duration_ms": round((time.perf_counter() - started) * 1000.0, 3),
+                })
+
             # store cache
             self._cache = result
             self.last_update = now
@@ -181,6 +210,109 @@ class MetricsData:
         finally:
             self.lock = False
 
+    def forecast_metrics(self):
+        """Metrics for every hour of the configured weather entity's forecast.
+
+        Blocking (calls weather.get_forecasts), so run it from an executor thread.
+        """
+        if not self.weatherEntity:
+            return None
+        state = self.hass.states.get(self.weatherEntity)
+        if state is None:
+            return None
+
+        now = time.time()
+        if (self._forecast is not None and state.last_updated == self._forecast_stamp
+                and now - self._forecast_fetched < FORECAST_TTL):
+            return self._forecast
+
+        try:
+            response = self.hass.services.call(
+                "weather", "get_forecasts", {"entity_id": self.weatherEntity, "type": "hourly"},
+                blocking=True, return_response=True,
+            )
+        except Exception:
+            self._warn(self.weatherEntity, "MetricsData: unable to fetch hourly forecast from %s",
+                       self.weatherEntity, exc_info=True)
+            return self._forecast
+        forecast = ((response or {}).get(self.weatherEntity) or {}).get("forecast") or []
+
+        self._forecast_stamp = state.last_updated
+        self._forecast_fetched = now
+
+        temp_unit = state.attributes.get("temperature_unit")
+        pressure_unit = state.attributes.get("pressure_unit")
+        # forecasts without pressure fall back to the current filtered station pressure;
+        # hours stay empty when no accepted pressure exists yet
+        fallback_pressure = self._cache.get("pressure") or self.filters["pressure"].last_value
+
+        points = []
+        for item in forecast:
+            temp = item.get("temperature")
+            hum = item.get("humidity")
+            pressure = item.get("pressure")
+            temp_k = None
+            if isinstance(temp, (int, float)):
+                temp_k = toK(FtoC(temp)) if temp_unit == UnitOfTemperature.FAHRENHEIT else toK(temp)
+            pressure_pa = self._pressure_to_pa(pressure, pressure_unit, self.weatherEntity) if isinstance(pressure, (int, float)) else fallback_pressure
+            points.append((item.get("datetime"), temp_k, hum if isinstance(hum, (int, float)) else None, pressure_pa))
+
+        key = tuple(points)
+        if key == self._forecast_key:
+            return self._forecast
+
+        # one batched pass: identical hours are solved once
+        solved = {}
+        result = []
+        for dt, temp_k, hum, pressure_pa in points:
+            entry = {"datetime": dt}
+            if temp_k is not None and hum is not None and pressure_pa is not None:
+                inputs = (temp_k, hum, pressure_pa)
+                if inputs not in solved:
+                    solved[inputs] = compute_point(*inputs)
+                entry.update(solved[inputs])
+            result.append(entry)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("MetricsData: computed %d forecast hours (%d distinct) for %s",
+                         len(result), len(solved), self.weatherEntity)
+        self._forecast_key = key
+        self._forecast = result
+        return result
+
+    def _warn(self, key, msg, *args, exc_info=False):
+        """Log a warning at most once per WARNING_INTERVAL for a given key, with a count of suppressed repeats."""
+        now = time.time()
+        entry = self._warned.get(key)
+        if entry is not None and now - entry[0] < WARNING_INTERVAL:
+            entry[1] += 1
+            return
+        suppressed = entry[1] if entry is not None else 0
+        self._warned[key] = [now, 0]
+        if suppressed:
+            msg += " (%d similar warnings suppressed)"
+            args += (suppressed,)
+        logger.warning(msg, *args, exc_info=exc_info)
+
+    def diagnostics(self):
+        """Snapshot of filter, warning and trace state for the diagnostics download."""
+        return {
+            "inputs": {
+                "temp": self.outdoorTemp,
+                "hum": self.outdoorHum,
+                "pressure": self.pressureSensor,
+                "dew": self.dewSensor,
+            },
+            "last_update": self.last_update,
+            "rejected_samples": {key: dict(f.rejected) for key, f in self.filters.items()},
+            "suppressed_warnings": {key: entry[1] for key, entry in self._warned.items()},
+            "trace": list(self.trace) if self.trace is not None else None,
+        }
+
+    def rejected_samples(self):
+        """Per-input count of samples dropped by the filter stage."""
+        return {key: f.rejected_total for key, f in self.filters.items() if f.rejected_total}
+
     # --- input normalization helpers (adapted from previous functions) ---
     def _outdoor_temp(self):
         state = self.hass.states.get(self.outdoorTemp)
@@ -189,7 +321,7 @@ class MetricsData:
         try:
             val = float(state.state)
         except (ValueError, TypeError):
-            logger.warning("Outdoor temp state not numeric: %s", state.state)
+            self._warn(self.outdoorTemp, "Outdoor temp state not numeric for %s: %s", self.outdoorTemp, state.state)
             return None
         unit = state.attributes.get("unit_of_measurement")
         if unit == UnitOfTemperature.CELSIUS:
@@ -208,16 +340,21 @@ class MetricsData:
         try:
             val = float(state.state)
         except (ValueError, TypeError):
-            logger.warning("Pressure state not numeric: %s", state.state)
+            self._warn(self.pressureSensor, "Pressure state not numeric for %s: %s", self.pressureSensor, state.state)
             return None
         unit = state.attributes.get("unit_of_measurement")
+        return self._pressure_to_pa(val, unit, self.pressureSensor)
+
+    def _pressure_to_pa(self, val, unit, source=None):
         if unit in (UnitOfPressure.HPA, "hPa", "mbar", "mb"):
             return val * 100.0
         if unit in (UnitOfPressure.PA, "Pa"):
             return val
         if unit in ("mmHg",):
             return val * 133.322
-        logger.debug("MetricsData: unknown pressure unit '%s' for %s; assuming hPa", unit, self.pressureSensor)
+        if unit in ("inHg",):
+            return val * 3386.389
+        logger.debug("MetricsData: unknown pressure unit '%s' for %s; assuming hPa", unit, source)
         return val * 100.0
 
     def _outdoor_hum(self):
@@ -227,7 +364,7 @@ class MetricsData:
         try:
             val = float(state.state)
         except (ValueError, TypeError):
-            logger.warning("Humidity state not numeric: %s", state.state)
+            self._warn(self.outdoorHum, "Humidity state not numeric for %s: %s", self.outdoorHum, state.state)
             return None
         unit = state.attributes.get("unit_of_measurement")
         if unit == PERCENTAGE or unit == "%":
@@ -246,7 +383,7 @@ class MetricsData:
         try:
             val = float(state.state)
         except (ValueError, TypeError):
-            logger.warning("Dew point state not numeric: %s", state.state)
+            self._warn(self.dewSensor, "Dew point state not numeric for %s: %s", self.dewSensor, state.state)
             return None
         unit = state.attributes.get("unit_of_measurement")
         if unit == UnitOfTemperature.CELSIUS:
@@ -258,53 +395,11 @@ class MetricsData:
         logger.debug("MetricsData: unknown dew unit '%s' for %s; assuming Celsius", unit, self.dewSensor)
         return toK(val)
 
-    # --- derived helpers ---
-    def _calculate_dewpoint(self, temp_out_k, hum_out):
-        if temp_out_k is not None and hum_out is not None:
-            try:
-                alpha = m.log(hum_out / 100) + (AA * toC(temp_out_k)) / (BB + toC(temp_out_k))
-                dp = (BB * alpha) / (AA - alpha)
-                return dp
-            except Exception:
-                logger.exception("MetricsData: invalid inputs for dewpoint calc (temp_k=%s, hum=%s)", temp_out_k, hum_out)
-        return None
-
-    """
-    heat_index_c is only computed when the Fahrenheit temperature T > 80 and relative humidity R > 40 
-    For typical outdoor temps (well under 80°F) the function returns None, so the attribute is not added.
-    """
-    def _calculate_heat_index(self, temp_k, hum):
-        if temp_k is not None and hum is not None:
-            T = KtoF(temp_k)
-            R = hum
-            if T > 80 and R > 40:
-                hi = c1 + c2 * T + c3 * R + c4 * T * R + c5 * m.pow(T, 2) + c6 * m.pow(R, 2) + c7 * m.pow(T, 2) * R + c8 * m.pow(R, 2) * T + c9 * m.pow(T, 2) * m.pow(R, 2)
-                return FtoC(hi)
-        return None
-
-    def _calculate_wb_stull(self, temp_k, hum):
-        if temp_k is None or hum is None:
-            return None
-        T = toC(temp_k)
-        H = hum
-        if not isinstance(H, (int, float)) or not isinstance(T, (int, float)):
-            return None
-        if H > 5 and H < 99 and T > -20 and T < 50:
-            return T * m.atan(0.151977 * m.pow(H + 8.313659, 0.5)) + m.atan(T + H) - m.atan(H - 1.676331) + 0.00391838 * m.pow(H, 3/2) * m.atan(0.023101 * H) - 4.686035
-        return None
-
-    def _determine_comfort(self, dp):
-        if dp is None:
-            return None
-        if dp > 21:
-            return 4
-        if dp > 18:
-            return 3
-        if dp > 16:
-            return 2
-        if dp > 10:
-            return 1
-        return 0
+    # --- derived helpers (pure functions shared with forecasts and services) ---
+    _calculate_dewpoint = staticmethod(calculate_dewpoint)
+    _calculate_heat_index = staticmethod(calculate_heat_index)
+    _calculate_wb_stull = staticmethod(calculate_wb_stull)
+    _determine_comfort = staticmethod(determine_comfort)
 
 
 # --- Base sensor class used by all metric sensors ---
@@ -345,10 +440,24 @@ class MetricsBaseSensor(Entity):
 
 class WetBulbSISensor(MetricsBaseSensor):
     """Main wet-bulb sensor (keeps prior behaviour/state)"""
+    # the forecast list changes hourly and is large; keep it out of the recorder
+    _unrecorded_attributes = frozenset({"forecast"})
+
     def __init__(self, hass, data, name, base_id):
         # use the base name (no suffix) so the sensor's name is the user-provided name
         super().__init__(hass, data, name, base_id, "")
         self._attr_unit = UnitOfTemperature.CELSIUS
+        self._forecast = None
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        # lets services address this instance by the wet bulb entity_id
+        self._data.entity_id = self.entity_id
+
+    def update(self):
+        super().update()
+        if self._data.weatherEntity:
+            self._forecast = self._data.forecast_metrics()
 
     @property
     def state(self):
@@ -482,6 +591,14 @@ class WetBulbSISensor(MetricsBaseSensor):
         if self._data.dewSensor:
             attrs["input_dew_entity"] = self._data.dewSensor
 
+        rejected = self._data.rejected_samples()
+        if rejected:
+            attrs["rejected_samples"] = rejected
+
+        if self._forecast:
+            attrs["input_weather_entity"] = self._data.weatherEntity
+            attrs["forecast"] = self._forecast
+
         return attrs
 
 
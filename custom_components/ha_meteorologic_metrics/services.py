@@ -0,0 +1,137 @@
+"""Services for Meteorologic Metrics."""
+
+from __future__ import annotations
+
+import math
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    DOMAIN,
+    DATA_METRICS,
+    DEFAULT_PRESSURE_HPA,
+    RANGE_HUMIDITY,
+    RANGE_PRESSURE_PA,
+    RANGE_TEMP_K,
+)
+from .helpers import toC
+from .engine import compute_points
+from .chart import chart_data
+
+SERVICE_GET_FORECAST_METRICS = "get_forecast_metrics"
+SERVICE_COMPUTE_METRICS = "compute_metrics"
+SERVICE_GET_CHART_DATA = "get_chart_data"
+
+ATTR_TEMPERATURE = "temperature"
+ATTR_HUMIDITY = "humidity"
+ATTR_PRESSURE = "pressure"
+
+
+
+def _finite(value: float) -> float:
+    if not math.isfinite(value):
+        raise vol.Invalid("value must be a finite number")
+    return value
+
+
+def _bounded(value_range) -> vol.All:
+    """Finite float within the same physical range the input filter applies."""
+    return vol.All(vol.Coerce(float), _finite, vol.Range(min=value_range[0], max=value_range[1]))
+
+
+TEMPERATURE_C = _bounded((round(toC(RANGE_TEMP_K[0]), 2), round(toC(RANGE_TEMP_K[1]), 2)))
+HUMIDITY = _bounded(RANGE_HUMIDITY)
+PRESSURE_HPA = _bounded((RANGE_PRESSURE_PA[0] / 100.0, RANGE_PRESSURE_PA[1] / 100.0))
+
+# temperature in °C, humidity in %, pressure in hPa (one value or one per point)
+BULK_INPUT_SCHEMA = {
+    vol.Required(ATTR_TEMPERATURE): vol.All(cv.ensure_list, [TEMPERATURE_C]),
+    vol.Required(ATTR_HUMIDITY): vol.All(cv.ensure_list, [HUMIDITY]),
+    vol.Optional(ATTR_PRESSURE, default=DEFAULT_PRESSURE_HPA): vol.Any(
+        PRESSURE_HPA, vol.All(cv.ensure_list, [PRESSURE_HPA])
+    ),
+}
+
+COMPUTE_METRICS_SCHEMA = vol.Schema(BULK_INPUT_SCHEMA)
+
+# pressure in hPa; defaults to the current pressure of the first configured instance
+CHART_DATA_SCHEMA = {
+    vol.Optional(ATTR_PRESSURE): vol.All(vol.Coerce(float), _finite, vol.Range(min=300, max=1100)),
+}
+
+GET_CHART_DATA_SCHEMA = vol.Schema(CHART_DATA_SCHEMA)
+
+GET_FORECAST_METRICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+
+def instances(hass: HomeAssistant, entity_ids=None):
+    """Configured MetricsData instances keyed by wet bulb entity_id, optionally filtered."""
+    found = {}
+    for base_id, data in hass.data.get(DOMAIN, {}).get(DATA_METRICS, {}).items():
+        key = data.entity_id or base_id
+        if entity_ids and key not in entity_ids:
+            continue
+        found[key] = data
+    return found
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration-level services."""
+
+    async def _async_get_forecast_metrics(call: ServiceCall) -> ServiceResponse:
+        forecasts = {}
+        for key, data in instances(hass, call.data.get(ATTR_ENTITY_ID)).items():
+            if not data.weatherEntity:
+                continue
+            # forecast_metrics blocks on weather.get_forecasts, keep it off the event loop
+            forecasts[key] = await hass.async_add_executor_job(data.forecast_metrics)
+        return {"forecasts": forecasts}
+
+    async def _async_compute_metrics(call: ServiceCall) -> ServiceResponse:
+        try:
+            results = await hass.async_add_executor_job(
+                compute_points,
+                call.data[ATTR_TEMPERATURE],
+                call.data[ATTR_HUMIDITY],
+                call.data[ATTR_PRESSURE],
+            )
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+        return {"results": results}
+
+    async def _async_get_chart_data(call: ServiceCall) -> ServiceResponse:
+        # chart_data refreshes every instance (blocking state reads + solve)
+        return await hass.async_add_executor_job(
+            chart_data, instances(hass), call.data.get(ATTR_PRESSURE)
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_COMPUTE_METRICS,
+        _async_compute_metrics,
+        schema=COMPUTE_METRICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_CHART_DATA,
+        _async_get_chart_data,
+        schema=GET_CHART_DATA_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_FORECAST_METRICS,
+        _async_get_forecast_metrics,
+        schema=GET_FORECAST_METRICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
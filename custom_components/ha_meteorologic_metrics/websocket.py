@@ -0,0 +1,64 @@
+"""Websocket commands for Meteorologic Metrics."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .engine import compute_points
+from .chart import chart_data
+from .services import (
+    ATTR_HUMIDITY,
+    ATTR_PRESSURE,
+    ATTR_TEMPERATURE,
+    BULK_INPUT_SCHEMA,
+    CHART_DATA_SCHEMA,
+    instances,
+)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/compute_metrics",
+        **BULK_INPUT_SCHEMA,
+    }
+)
+@websocket_api.async_response
+async def ws_compute_metrics(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Compute all metrics for arrays of temperature / humidity / pressure."""
+    try:
+        results = await hass.async_add_executor_job(
+            compute_points, msg[ATTR_TEMPERATURE], msg[ATTR_HUMIDITY], msg[ATTR_PRESSURE]
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, str(err))
+        return
+    connection.send_result(msg["id"], {"results": results})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/chart_data",
+        **CHART_DATA_SCHEMA,
+    }
+)
+@websocket_api.async_response
+async def ws_chart_data(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Psychrometric chart lines plus the current point of every configured instance."""
+    result = await hass.async_add_executor_job(chart_data, instances(hass), msg.get(ATTR_PRESSURE))
+    connection.send_result(msg["id"], result)
+
+
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register websocket commands."""
+    websocket_api.async_register_command(hass, ws_compute_metrics)
+    websocket_api.async_register_command(hass, ws_chart_data)